@@ -12,7 +12,14 @@ from io import BytesIO
 import platform
 import shutil
 import re
-from typing import List, Tuple, Dict, Any, Optional
+import signal
+import socket
+import ssl
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit
+from typing import List, Tuple, Dict, Any, Optional, Iterator
 
 import qrcode
 from selenium import webdriver
@@ -28,6 +35,7 @@ HEADLESS = True  # set False once to watch it run
 LOGO_FILENAMES = ["logo.jpeg", "logo.png"]
 LOG_FILE = "debug_log.txt"
 UPDATE_CHECK_INTERVAL = 10
+REFRESH_SECONDS = 300         # pause between scrape cycles
 GITHUB_REPO = "brandond007/target_optical_scraper"
 BRANCH = "main"
 SCRIPT_FILENAME = "target_optical_scraper.py"
@@ -37,6 +45,20 @@ SKIP_LOGO_ON_UPDATE = True
 CONFIG_FILE = "scraper_config.json"
 MAX_DAYS_PER_RUN = 6          # scrape up to N days each run
 MONTHS_TO_SCAN = 2            # current month + N-1 next months
+BROWSER_RSS_LIMIT_MB = 550    # recycle the browser when its process tree's memory (PSS) grows past this
+BROWSER_MAX_RECYCLES = 1      # relaunches allowed per cycle before we just ride it out
+BROWSER_MARKER_ARG = "--target-optical-scraper"  # tags chromium we launched with our pid (for orphan reaping)
+FIXTURES_DIR = "fixtures"     # --record writes session bundles here
+FIXTURE_VERSION = 1           # bump when the bundle layout changes
+REPLAY_HTML_FILENAME = "replay_eye_appointments.html"  # --replay never overwrites the live dashboard
+RESULTS_CACHE_FILE = "results_cache.json"  # last known good results per store
+STALE_AFTER_MINUTES = 30      # dashboard shows a staleness banner once data is older than this
+CYCLE_BUDGET_SECONDS = 240    # hard-ish cap on one scrape cycle; partial results are kept
+PHASE_BUDGETS = {"load": 75, "wizard": 60, "calendar": 30, "days": 150}  # seconds, each capped by the cycle
+WATCHDOG_GRACE_SECONDS = 30   # past budget + grace the browser is killed outright
+PROGRESSIVE_PUBLISH_AFTER_DAYS = 1  # start updating the dashboard once this many days are scraped
+TRACE_WEBDRIVER = False       # or pass --trace; writes a Perfetto/chrome://tracing timeline per cycle
+TRACES_DIR = "traces"
 # ============================================ #
 
 # -------------- Utils / Logging -------------- #
@@ -168,8 +190,74 @@ def get_schedule_exam_url(store_number):
         f"&storeNumber={store_number}&clearExams=1&cid=yext_{store_number}"
     )
 
+# -------------- Cycle deadline -------------- #
+class DeadlineExceeded(Exception):
+    def __init__(self, phase: str, budget: float):
+        super().__init__(f"deadline exceeded in phase '{phase}' (budget {budget:.0f}s)")
+        self.phase = phase
+
+class Deadline:
+    """
+    Time budget for one scrape cycle, split into PHASE_BUDGETS. Helpers take `deadline=`
+    and clamp their own waits to remaining(); phase code calls check() to bail out.
+    """
+    def __init__(self, total=CYCLE_BUDGET_SECONDS, budgets=None):
+        self.total = total
+        self.budgets = PHASE_BUDGETS if budgets is None else budgets
+        self.end = time.monotonic() + total
+        self.phase = "start"
+        self.phase_budget = total
+        self.phase_end = self.end
+        self._phase_started = time.monotonic()
+        self.timings: List[Tuple[str, float]] = []
+
+    def start(self, phase: str):
+        now = time.monotonic()
+        self.timings.append((self.phase, now - self._phase_started))
+        self.phase = phase
+        self.phase_budget = self.budgets.get(phase, self.total)
+        self.phase_end = min(self.end, now + self.phase_budget)
+        self._phase_started = now
+
+    def remaining(self) -> float:
+        return max(0.0, self.phase_end - time.monotonic())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def clamp(self, timeout: float) -> float:
+        return min(timeout, self.remaining())
+
+    def check(self):
+        if self.expired():
+            raise DeadlineExceeded(self.phase, self.phase_budget)
+
+    def summary(self) -> str:
+        timings = self.timings + [(self.phase, time.monotonic() - self._phase_started)]
+        return " ".join(f"{ph}={sec:.1f}s" for ph, sec in timings if ph != "start")
+
+def _clamp(deadline, timeout):
+    return deadline.clamp(timeout) if deadline else timeout
+
 # -------------- Selenium helpers -------------- #
-def build_driver():
+# Replay: shift the page's clock so it runs from the recording time (date pickers open on "today")
+_FAKE_CLOCK_JS = r"""
+(function () {
+  var offset = %d, RealDate = Date;
+  function FakeDate() {
+    if (!(this instanceof FakeDate)) return new RealDate(RealDate.now() + offset).toString();
+    if (arguments.length) return new (Function.prototype.bind.apply(RealDate, [null].concat([].slice.call(arguments))))();
+    return new RealDate(RealDate.now() + offset);
+  }
+  FakeDate.prototype = RealDate.prototype;
+  FakeDate.now = function () { return RealDate.now() + offset; };
+  FakeDate.parse = RealDate.parse;
+  FakeDate.UTC = RealDate.UTC;
+  Date = FakeDate;
+})();
+"""
+
+def build_driver(record=False, replay_host_rules=None, fake_now: Optional[datetime] = None):
     options = Options()
     if HEADLESS:
         options.add_argument("--headless=new")
@@ -180,6 +268,20 @@ def build_driver():
     options.add_argument("user-agent=Mozilla/5.0 (X11; Linux) AppleWebKit/537.36 (KHTML, like Gecko) Chrome Safari/537.36")
     options.add_experimental_option("excludeSwitches", ["enable-automation"])
     options.add_experimental_option("useAutomationExtension", False)
+    options.add_argument(f"{BROWSER_MARKER_ARG}={os.getpid()}")
+    if record:
+        # Network.* events land in the performance log; SessionRecorder drains it
+        options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    if replay_host_rules:
+        # replay: recorded hosts resolve to the local fixture server (self-signed TLS),
+        # everything else fails to resolve so nothing reaches the real internet
+        options.add_argument(f"--host-resolver-rules={replay_host_rules}")
+        options.add_argument("--ignore-certificate-errors")
+        options.add_argument("--disable-quic")
+    if fake_now:
+        # keep cross-site iframes (the calendar) in-process so the clock override reaches them
+        options.add_argument("--disable-site-isolation-trials")
+        options.add_argument("--disable-features=IsolateOrigins,site-per-process")
 
     chromium_bin = shutil.which("chromium") or shutil.which("chromium-browser") or "/usr/bin/chromium"
     if os.path.exists(chromium_bin):
@@ -197,6 +299,12 @@ def build_driver():
             {"source": "Object.defineProperty(navigator, 'webdriver', {get: () => undefined});"})
     except Exception:
         pass
+    if fake_now:
+        try:
+            offset_ms = int((fake_now.timestamp() - time.time()) * 1000)
+            drv.execute_cdp_cmd("Page.addScriptToEvaluateOnNewDocument", {"source": _FAKE_CLOCK_JS % offset_ms})
+        except Exception as e:
+            write_log(f"fake clock injection failed: {e}")
     drv.set_page_load_timeout(60)
     drv.set_script_timeout(60)
     return drv
@@ -236,14 +344,16 @@ def stable_click(driver, el) -> bool:
     except Exception:
         return False
 
-def click_any_by_text(driver, labels, tags=("button","div","span","a"), timeout=6):
-    end = time.time() + timeout
+def click_any_by_text(driver, labels, tags=("button","div","span","a"), timeout=6, deadline=None):
+    end = time.time() + _clamp(deadline, timeout)
     while time.time() < end:
         try:
             nodes=[]
             for t in tags:
                 nodes.extend(driver.find_elements(By.TAG_NAME, t))
             for n in nodes:
+                if deadline and deadline.expired():
+                    return False  # each node costs round trips; don't finish the pass
                 if not n.is_displayed():
                     continue
                 txt = safe_text(n).lower()
@@ -258,8 +368,8 @@ def click_any_by_text(driver, labels, tags=("button","div","span","a"), timeout=
         time.sleep(0.15)
     return False
 
-def advance_continue(driver):
-    click_any_by_text(driver, ["continue","next","proceed","start","get started","schedule","confirm"], timeout=3)
+def advance_continue(driver, deadline=None):
+    click_any_by_text(driver, ["continue","next","proceed","start","get started","schedule","confirm"], timeout=3, deadline=deadline)
 
 # --------- Calendar / iframe detection tuned for MUI --------- #
 def switch_into_calendar_iframe(driver) -> bool:
@@ -295,16 +405,16 @@ def _has_enabled_numeric_day(driver) -> bool:
             return True
     return False
 
-def wait_for_calendar_loaded(driver, timeout=25):
-    wait = WebDriverWait(driver, timeout)
+def wait_for_calendar_loaded(driver, timeout=25, deadline=None):
+    wait = WebDriverWait(driver, _clamp(deadline, timeout))
     # any MUI calendar pieces
     return wait.until(EC.any_of(
         EC.presence_of_element_located((By.CSS_SELECTOR, "button[aria-label='Go to next month']")),
         EC.presence_of_element_located((By.CSS_SELECTOR, "button.MuiButtonBase-root:not(.Mui-disabled)")),
     ))
 
-def click_next_month(driver, timeout=10) -> bool:
-    wait = WebDriverWait(driver, timeout)
+def click_next_month(driver, timeout=10, deadline=None) -> bool:
+    wait = WebDriverWait(driver, _clamp(deadline, timeout))
     # Primary: exact aria-label used on your saved page
     try:
         nxt = wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, "button[aria-label='Go to next month']")))
@@ -375,8 +485,10 @@ def slots_panel_visible(driver) -> bool:
             return True
     return False
 
-def wait_for_slots_change(driver, prev_len=None, tries=22):
+def wait_for_slots_change(driver, prev_len=None, tries=22, deadline=None):
     for _ in range(tries):
+        if deadline and deadline.expired():
+            return False
         if slots_panel_visible(driver):
             return True
         cur_len = len(driver.page_source)
@@ -386,11 +498,58 @@ def wait_for_slots_change(driver, prev_len=None, tries=22):
         prev_len = cur_len
     return False
 
-def collect_slots_any_ui(driver) -> Tuple[Dict[str, List[str]], List[str]]:
+def _bucket_time(t: str) -> str:
+    # bucket approx
+    try:
+        hr = int(re.search(r"(\d{1,2}):", t).group(1))
+        am = "AM" in t
+        if am and hr < 11:
+            return "morning"
+        if (am and hr == 11) or (not am and hr < 5):
+            return "afternoon"
+        return "evening"
+    except Exception:
+        return "afternoon"
+
+def _clean_doctor(name: str) -> str:
+    return name.replace("Dr. ", "").replace("Dr ", "").strip()
+
+# One round trip each instead of a find_elements + innerText call per node
+_FINGERPRINT_JS = r"""
+if (document.querySelector("div[class*='aptm-tab-layout']")) return "tabbed";
+var re = /\b\d{1,2}:\d{2}\s?(AM|PM)\b/;
+var nodes = document.querySelectorAll("button,div,span");
+for (var i = 0; i < nodes.length; i++) {
+  if (re.test(nodes[i].innerText || "")) return "flat";
+}
+return "unknown";
+"""
+
+_FLAT_SCAN_JS = r"""
+var timeRe = /\b\d{1,2}:\d{2}\s?(AM|PM)\b/, docRe = /Dr\.?\s+[A-Za-z][\w\- ]+/;
+var times = {}, doctors = {};
+document.querySelectorAll("button,div,span").forEach(function (n) {
+  var t = (n.innerText || "").trim(), m = t.match(timeRe), d = t.match(docRe);
+  if (m) times[m[0]] = 1;
+  if (d) doctors[d[0]] = 1;
+});
+return {times: Object.keys(times), doctors: Object.keys(doctors),
+        tabbed: !!document.querySelector("div[class*='aptm-tab-layout']")};
+"""
+
+_PAGE_VARIANTS: Dict[str, str] = {}  # store_number -> "tabbed" | "flat", for the life of the process
+
+def detect_page_variant(driver) -> str:
+    """Fingerprint the slot layout: 'tabbed' (aptm MORNING/AFTERNOON/EVENING panel), 'flat' (time chips) or 'unknown'."""
+    try:
+        return driver.execute_script(_FINGERPRINT_JS) or "unknown"
+    except Exception as e:
+        write_log(f"detect_page_variant error: {e}")
+        return "unknown"
+
+def _collect_tabbed(driver, deadline=None, tab_timeout=3) -> Tuple[Dict[str, List[str]], set, bool]:
     slots_by = {"morning": [], "afternoon": [], "evening": []}
     doctors = set()
-
-    # Tabbed UI first
     tabs = [
         ("morning",   "//div[contains(@class,'aptm-tab-layout')][contains(.,'MORNING')]"),
         ("afternoon", "//div[contains(@class,'aptm-tab-layout')][contains(.,'AFTERNOON')]"),
@@ -398,14 +557,18 @@ def collect_slots_any_ui(driver) -> Tuple[Dict[str, List[str]], List[str]]:
     ]
     any_tab = False
     for label, xp in tabs:
+        if deadline and deadline.expired():
+            break
         try:
-            tab = WebDriverWait(driver, 3).until(EC.element_to_be_clickable((By.XPATH, xp)))
+            tab = WebDriverWait(driver, _clamp(deadline, tab_timeout)).until(EC.element_to_be_clickable((By.XPATH, xp)))
             driver.execute_script("arguments[0].scrollIntoView({block:'center'});", tab)
             driver.execute_script("arguments[0].click();", tab)
             time.sleep(0.35)
             any_tab = True
             boxes = driver.find_elements(By.CLASS_NAME, "aptm-box")
             for box in boxes:
+                if deadline and deadline.expired():
+                    break
                 try:
                     t_text = ""
                     d_text = ""
@@ -422,47 +585,77 @@ def collect_slots_any_ui(driver) -> Tuple[Dict[str, List[str]], List[str]]:
                     if t_text:
                         slots_by[label].append(t_text)
                     if d_text:
-                        doctors.add(d_text.replace("Dr. ", "").replace("Dr ", "").strip())
+                        doctors.add(_clean_doctor(d_text))
                 except Exception:
                     continue
         except Exception:
             continue
 
-    if not any_tab:
-        # flat time chips anywhere
-        flat = set()
-        nodes = driver.find_elements(By.XPATH, "//*[self::button or self::div or self::span]")
-        for n in nodes:
-            m = re.search(r"\b\d{1,2}:\d{2}\s?(AM|PM)\b", safe_text(n))
-            if m:
-                flat.add(m.group(0))
-        if flat:
-            # bucket approx
-            def bucket(t):
-                try:
-                    hr = int(re.search(r"(\d{1,2}):", t).group(1))
-                    am = "AM" in t
-                    if am and hr < 11:
-                        return "morning"
-                    if (am and hr == 11) or (not am and hr < 5):
-                        return "afternoon"
-                    return "evening"
-                except Exception:
-                    return "afternoon"
-            for t in sorted(flat):
-                slots_by[bucket(t)].append(t)
+    return slots_by, doctors, any_tab
 
-        # doctor names heuristic
-        for n in nodes:
-            mt = re.search(r"Dr\.?\s+[A-Za-z][\w\- ]+", safe_text(n))
-            if mt:
-                doctors.add(mt.group(0).replace("Dr. ", "").replace("Dr ", "").strip())
+def _collect_flat(driver) -> Tuple[Dict[str, List[str]], set, bool]:
+    """Flat time chips in one scan; the flag says whether the tabbed panel is on the page too."""
+    slots_by = {"morning": [], "afternoon": [], "evening": []}
+    try:
+        found = driver.execute_script(_FLAT_SCAN_JS) or {}
+    except Exception as e:
+        write_log(f"flat slot scan error: {e}")
+        found = {}
+    for t in sorted(set(found.get("times", []))):
+        slots_by[_bucket_time(t)].append(t)
+    return slots_by, {_clean_doctor(d) for d in found.get("doctors", [])}, bool(found.get("tabbed"))
+
+def collect_slots_any_ui(driver, deadline=None) -> Tuple[Dict[str, List[str]], List[str]]:
+    """Layout-agnostic: probe the tabbed panel, fall back to flat time chips anywhere."""
+    slots_by, doctors, any_tab = _collect_tabbed(driver, deadline)
+    if not any_tab:
+        slots_by, doctors, _ = _collect_flat(driver)
+    return {k: sorted(v) for k, v in slots_by.items()}, sorted(doctors)
 
+def _collect_variant(driver, variant, deadline=None) -> Optional[Tuple[Dict[str, List[str]], List[str]]]:
+    """Dedicated extractor for a known layout; None if the page doesn't match it."""
+    if variant == "tabbed":
+        slots_by, doctors, any_tab = _collect_tabbed(driver, deadline, tab_timeout=1)
+        if not any_tab:
+            return None
+    else:
+        slots_by, doctors, tabbed = _collect_flat(driver)
+        if tabbed:
+            return None  # the flat scan would only see the open tab's times
     return {k: sorted(v) for k, v in slots_by.items()}, sorted(doctors)
 
+def collect_slots(driver, store_number, deadline=None) -> Tuple[Dict[str, List[str]], List[str]]:
+    """
+    Slot collection dispatched on the store's cached page variant. The first day with a
+    recognisable layout fingerprints it; an empty or mismatched extraction re-fingerprints
+    so a site change switches extractors (or drops back to collect_slots_any_ui).
+    """
+    key = str(store_number)
+    variant = _PAGE_VARIANTS.get(key)
+    if variant is None:
+        variant = detect_page_variant(driver)
+        if variant == "unknown":
+            return collect_slots_any_ui(driver, deadline)
+        _PAGE_VARIANTS[key] = variant
+        write_log(f"Page variant for store {store_number}: {variant}")
+
+    result = _collect_variant(driver, variant, deadline)
+    if result is None or not any(result[0].values()):
+        seen = detect_page_variant(driver)
+        if seen not in (variant, "unknown"):
+            write_log(f"Page variant for store {store_number} changed: {variant} -> {seen}")
+            _PAGE_VARIANTS[key] = seen
+            result = _collect_variant(driver, seen, deadline)
+        if result is None:
+            # expected layout is gone and nothing recognisable replaced it
+            write_log(f"Page variant '{variant}' for store {store_number} no longer matches; re-detecting next day")
+            _PAGE_VARIANTS.pop(key, None)
+            result = collect_slots_any_ui(driver, deadline)
+    return result
+
 # --------- Wizard (accept cookies + exam + seen-before) --------- #
-def click_seen_before_no(driver, timeout=8) -> bool:
-    end = time.time() + timeout
+def click_seen_before_no(driver, timeout=8, deadline=None) -> bool:
+    end = time.time() + _clamp(deadline, timeout)
     qs = [
         "//*/text()[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'been seen')]/ancestor::*[1]//button[normalize-space()='No']",
         "//*/text()[contains(translate(.,'ABCDEFGHIJKLMNOPQRSTUVWXYZ','abcdefghijklmnopqrstuvwxyz'),'returning patient')]/ancestor::*[1]//button[normalize-space()='No']",
@@ -471,6 +664,8 @@ def click_seen_before_no(driver, timeout=8) -> bool:
     ]
     while time.time() < end:
         for xp in qs:
+            if deadline and deadline.expired():
+                return False
             try:
                 el = driver.find_element(By.XPATH, xp)
                 if el.is_displayed() and stable_click(driver, el):
@@ -478,13 +673,17 @@ def click_seen_before_no(driver, timeout=8) -> bool:
                     return True
             except Exception:
                 continue
-        click_any_by_text(driver, ["i am a new patient","new patient"], timeout=1)
+        click_any_by_text(driver, ["i am a new patient","new patient"], timeout=1, deadline=deadline)
         time.sleep(0.25)
     return False
 
-def navigate_intro_flow(driver):
+def navigate_intro_flow(driver, recorder=None, deadline=None):
     # Accept cookies always
-    click_any_by_text(driver, ["accept all cookies","accept all","accept","i agree","got it","allow all"], timeout=3)
+    click_any_by_text(driver, ["accept all cookies","accept all","accept","i agree","got it","allow all"], timeout=3, deadline=deadline)
+    if recorder:
+        recorder.snapshot("cookies")
+    if deadline:
+        deadline.check()
 
     # Early exit if calendar already present (either in main DOM or iframe)
     driver.switch_to.default_content()
@@ -498,26 +697,38 @@ def navigate_intro_flow(driver):
         driver.switch_to.default_content()
 
     print("➡️ Clicking exam/start…")
-    click_any_by_text(driver, ["eye exam","comprehensive eye exam","comprehensive exam","schedule exam","book now"], timeout=6)
-    advance_continue(driver)
+    click_any_by_text(driver, ["eye exam","comprehensive eye exam","comprehensive exam","schedule exam","book now"], timeout=6, deadline=deadline)
+    advance_continue(driver, deadline=deadline)
+    if recorder:
+        recorder.snapshot("exam start")
+    if deadline:
+        deadline.check()
 
     print("➡️ Answering seen-before = No…")
-    clicked = click_seen_before_no(driver, timeout=10)
+    clicked = click_seen_before_no(driver, timeout=10, deadline=deadline)
     if not clicked:
-        click_any_by_text(driver, ["no"], timeout=3)
-    advance_continue(driver)
+        click_any_by_text(driver, ["no"], timeout=3, deadline=deadline)
+    advance_continue(driver, deadline=deadline)
+    if recorder:
+        recorder.snapshot("seen before")
+    if deadline:
+        deadline.check()
 
     print("➡️ Skipping optional prompts…")
-    for _ in range(4):
+    for i in range(4):
         hit = (
-            click_any_by_text(driver, ["no"], timeout=1) or
-            click_any_by_text(driver, ["skip"], timeout=1) or
-            click_any_by_text(driver, ["not now"], timeout=1) or
-            click_any_by_text(driver, ["i don’t know","i don't know"], timeout=1)
+            click_any_by_text(driver, ["no"], timeout=1, deadline=deadline) or
+            click_any_by_text(driver, ["skip"], timeout=1, deadline=deadline) or
+            click_any_by_text(driver, ["not now"], timeout=1, deadline=deadline) or
+            click_any_by_text(driver, ["i don’t know","i don't know"], timeout=1, deadline=deadline)
         )
         if hit:
-            advance_continue(driver)
+            advance_continue(driver, deadline=deadline)
             time.sleep(0.25)
+            if recorder:
+                recorder.snapshot(f"optional prompt {i + 1}")
+            if deadline:
+                deadline.check()
         else:
             break
 
@@ -525,33 +736,678 @@ def navigate_intro_flow(driver):
     if not (driver.find_elements(By.CSS_SELECTOR, "button[aria-label='Go to next month']") or _has_enabled_numeric_day(driver)):
         switch_into_calendar_iframe(driver)
 
-# -------------------- Scraper core -------------------- #
-def run_scraper():
-    driver = None
+# -------------- Browser resource governor -------------- #
+try:
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+except (AttributeError, ValueError, OSError):
+    _PAGE_SIZE, _CLK_TCK = 4096, 100
+
+def _read_proc_stat(pid: int) -> Optional[Tuple[str, str, int, int]]:
+    """(comm, state, ppid, cpu_ticks) from /proc/<pid>/stat, or None if it is gone."""
     try:
-        config, _ = load_config()
-        store_number = config.get("store_number", 2064)
-        url = get_schedule_exam_url(store_number)
-        print(f"[DEBUG] Using store_number: {store_number}")
-        print(f"[DEBUG] Full URL: {url}")
-        write_log(f"[DEBUG] URL: {url}")
+        with open(f"/proc/{pid}/stat", "r") as f:
+            raw = f.read()
+        head, _, rest = raw.rpartition(")")
+        fields = rest.split()
+        return head.partition("(")[2], fields[0], int(fields[1]), int(fields[11]) + int(fields[12])
+    except Exception:
+        return None
+
+def _proc_table() -> Dict[int, Tuple[str, str, int, int]]:
+    table = {}
+    try:
+        for name in os.listdir("/proc"):
+            if name.isdigit():
+                st = _read_proc_stat(int(name))
+                if st:
+                    table[int(name)] = st
+    except Exception:
+        pass
+    return table
+
+def _proc_cmdline(pid: int) -> str:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return f.read().replace(b"\0", b" ").decode("utf-8", "replace")
+    except Exception:
+        return ""
 
-        driver = build_driver()
-        driver.get(url)
-        time.sleep(1.2)
+def _proc_mem(pid: int) -> int:
+    """
+    Proportional set size in bytes: shared pages are split between the processes mapping
+    them, so summing over chromium's processes doesn't count them once per process the
+    way RSS does. Falls back to RSS from statm on kernels without smaps_rollup (< 4.14).
+    """
+    try:
+        with open(f"/proc/{pid}/smaps_rollup", "r") as f:
+            for line in f:
+                if line.startswith("Pss:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    except Exception:
+        return 0
+    try:
+        with open(f"/proc/{pid}/statm", "r") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except Exception:
+        return 0
+
+def _descendants(root: int, table) -> List[int]:
+    children: Dict[int, List[int]] = {}
+    for pid, (_, _, ppid, _) in table.items():
+        children.setdefault(ppid, []).append(pid)
+    out, todo = [], [root]
+    while todo:
+        pid = todo.pop()
+        if pid in table:
+            out.append(pid)
+        todo.extend(children.get(pid, []))
+    return out
 
-        navigate_intro_flow(driver)
+def _is_browser_proc(st) -> bool:
+    # chromium, chromium-browse, chrome, chromedriver, chrome_crashpad...
+    return bool(st) and st[1] != "Z" and "chrom" in st[0]
 
-        # Make sure we're in the calendar context
-        driver.switch_to.default_content()
-        if not (driver.find_elements(By.CSS_SELECTOR, "button[aria-label='Go to next month']") or _has_enabled_numeric_day(driver)):
-            switch_into_calendar_iframe(driver)
+def _terminate_pids(pids, grace=3.0):
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        for pid in pids:
+            try:
+                os.kill(pid, sig)
+            except (ProcessLookupError, PermissionError):
+                pass
+        end = time.time() + grace
+        while time.time() < end:
+            for pid in pids:
+                try:
+                    os.waitpid(pid, os.WNOHANG)  # reap our own children (chromedriver)
+                except ChildProcessError:
+                    pass
+            if not any(_is_browser_proc(_read_proc_stat(p)) for p in pids):
+                return
+            time.sleep(0.2)
+
+def _marker_owner(pid: int) -> Optional[int]:
+    """Pid of the scraper that launched this chromium, from its BROWSER_MARKER_ARG; None if untagged."""
+    m = re.search(re.escape(BROWSER_MARKER_ARG) + r"=(\d+)", _proc_cmdline(pid))
+    return int(m.group(1)) if m else None
+
+def _owner_gone(owner: int) -> bool:
+    st = _read_proc_stat(owner)
+    return st is None or st[1] == "Z"
+
+def reap_orphaned_browsers() -> int:
+    """
+    Kill chromium launched by build_driver() whose owning scraper (the pid in its
+    BROWSER_MARKER_ARG) is dead or is this process, the chromedriver driving it, and
+    everything under them. Browsers of another scraper that is still running (e.g. the
+    kiosk loop during --record), other Selenium jobs and a kiosk browser are left alone.
+    """
+    if not os.path.isdir("/proc"):
+        return 0
+    table = _proc_table()
+    marked = set()
+    for pid, st in table.items():
+        if not _is_browser_proc(st):
+            continue
+        owner = _marker_owner(pid)
+        if owner is not None and (owner == os.getpid() or _owner_gone(owner)):
+            marked.add(pid)
+    victims = set()
+    for pid, st in table.items():
+        if pid in marked:
+            victims.update(_descendants(pid, table))
+        elif _is_browser_proc(st) and st[0].startswith("chromedriver"):
+            tree = _descendants(pid, table)
+            if marked.intersection(tree):
+                victims.update(tree)
+    victims.discard(os.getpid())
+    if victims:
+        write_log(f"Reaping {len(victims)} orphaned browser process(es): {sorted(victims)}")
+        _terminate_pids(sorted(victims))
+    return len(victims)
+
+class BrowserRecycle(Exception):
+    """Raised at a checkpoint when the browser tree has outgrown BROWSER_RSS_LIMIT_MB."""
+    def __init__(self, phase: str, rss: int):
+        super().__init__(f"browser memory {rss / 1048576:.0f} MB PSS over limit after '{phase}'")
+        self.phase = phase
+
+class BrowserGovernor:
+    """
+    Owns the driver for one scrape cycle: tracks the chromedriver/chromium process tree,
+    samples memory (PSS) + CPU at each phase checkpoint, and guarantees the tree is gone on shutdown.
+    """
+    def __init__(self, rss_limit_mb=BROWSER_RSS_LIMIT_MB, max_recycles=BROWSER_MAX_RECYCLES):
+        self.rss_limit = rss_limit_mb * 1048576
+        self.max_recycles = max_recycles
+        self.recycles = 0
+        self.driver = None
+        self.root_pid = None
+        self.known_pids = set()
+        self.samples: List[Tuple[str, int, float, int]] = []  # (phase, rss bytes, cpu s, nprocs)
+        self._cpu_seen: Dict[int, int] = {}
+        self._started = time.time()
+
+    def launch(self, **driver_opts):
+        self.driver = build_driver(**driver_opts)
+        try:
+            self.root_pid = self.driver.service.process.pid
+        except Exception:
+            self.root_pid = None
+        self.checkpoint("launch")
+        return self.driver
 
-        scrape_calendar(driver, store_number, url)
+    def tree(self) -> List[int]:
+        if not self.root_pid or not os.path.isdir("/proc"):
+            return []
+        return _descendants(self.root_pid, _proc_table())
+
+    def checkpoint(self, phase: str, defer=False):
+        """
+        Sample the tree after `phase`; raises BrowserRecycle if it is too big and we may relaunch.
+        defer=True (days phase) only logs: relaunching would throw away the days already
+        scraped, and the browser is torn down at the end of the cycle anyway.
+        """
+        if not self.root_pid or not os.path.isdir("/proc"):
+            return
+        table = _proc_table()
+        pids = _descendants(self.root_pid, table)
+        self.known_pids.update(pids)
+        rss = sum(_proc_mem(p) for p in pids)
+        ticks = 0
+        for p in pids:
+            ticks += table[p][3] - self._cpu_seen.get(p, 0)
+            self._cpu_seen[p] = table[p][3]
+        self.samples.append((phase, rss, ticks / _CLK_TCK, len(pids)))
+        if rss > self.rss_limit:
+            if defer:
+                write_log(f"Browser PSS {rss / 1048576:.0f} MB over limit after '{phase}'; recycling at next cycle")
+            elif self.recycles < self.max_recycles:
+                raise BrowserRecycle(phase, rss)
+            else:
+                write_log(f"Browser PSS {rss / 1048576:.0f} MB over limit after '{phase}' (recycles exhausted)")
+
+    def recycle(self, reason: BrowserRecycle):
+        print(f"♻️ Recycling browser: {reason}")
+        write_log(f"Recycling browser: {reason}")
+        self.recycles += 1
+        self.shutdown()
+
+    def abort(self, reason: str):
+        """Watchdog path: kill the tree without quit(), which may itself be what's hanging."""
+        write_log(f"Watchdog: {reason}; killing browser")
+        pids = self.tree()
+        self.known_pids.update(pids)
+        if pids:
+            _terminate_pids(pids)
+
+    def shutdown(self):
+        """Quit the driver, then kill anything from its tree that survived quit()."""
+        self.known_pids.update(self.tree())
+        if self.driver:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                write_log(f"driver.quit failed: {e}")
+        leftovers = [p for p in self.known_pids if _is_browser_proc(_read_proc_stat(p))]
+        if leftovers:
+            write_log(f"{len(leftovers)} browser process(es) survived quit(); killing {sorted(leftovers)}")
+            _terminate_pids(leftovers)
+        self.driver = None
+        self.root_pid = None
+        self.known_pids = set()
+        self._cpu_seen = {}
+
+    def log_cycle_stats(self):
+        if not self.samples:
+            return
+        peak = max(s[1] for s in self.samples)
+        cpu = sum(s[2] for s in self.samples)
+        phases = ", ".join(f"{ph}={rss / 1048576:.0f}MB/{c:.1f}s/{n}p" for ph, rss, c, n in self.samples)
+        msg = (f"Browser resources: peak {peak / 1048576:.0f} MB PSS, {cpu:.1f}s CPU, "
+               f"{self.recycles} recycle(s), {time.time() - self._started:.0f}s wall [{phases}]")
+        print(f"📊 {msg}")
+        write_log(msg)
+
+# -------------- Session record / replay -------------- #
+def _replay_key(url: str) -> str:
+    parts = urlsplit(url)
+    return parts._replace(path=parts.path or "/", fragment="").geturl()
+
+class SessionRecorder:
+    """
+    Captures a live session as a fixture bundle under FIXTURES_DIR:
+      manifest.json   - version, store, start url, responses + snapshots index
+      responses/NNNN  - every response body the page received (documents, XHR/fetch, scripts...)
+      dom/NN_step.html - page_source after each wizard step and day click
+    Network traffic comes from Chrome's performance log (build_driver(record=True)).
+    """
+    def __init__(self, driver, store_number, url):
+        self.driver = driver
+        self.bundle = os.path.join(FIXTURES_DIR, f"store{store_number}_{datetime.now().strftime('%Y%m%d_%H%M%S')}")
+        os.makedirs(os.path.join(self.bundle, "responses"), exist_ok=True)
+        os.makedirs(os.path.join(self.bundle, "dom"), exist_ok=True)
+        self.manifest: Dict[str, Any] = {
+            "version": FIXTURE_VERSION,
+            "store_number": store_number,
+            "url": url,
+            "recorded_at": datetime.now().isoformat(timespec="seconds"),
+            "responses": [],
+            "snapshots": [],
+        }
+        self._requests: Dict[str, str] = {}   # requestId -> HTTP method
+        self._pending: Dict[str, dict] = {}   # requestId -> responseReceived params, body not ready yet
+        self._t0 = time.time()
+
+    def switch_driver(self, driver):
+        """Browser recycle: carry on recording into the same bundle with the new driver."""
+        self.driver = driver
+        self._requests = {}
+        self._pending = {}
+
+    def _drain(self, step: str):
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            write_log(f"SessionRecorder: performance log unavailable: {e}")
+            return
+        for entry in entries:
+            try:
+                msg = json.loads(entry["message"])["message"]
+            except Exception:
+                continue
+            method, params = msg.get("method"), msg.get("params", {})
+            rid = params.get("requestId")
+            if method == "Network.requestWillBeSent":
+                self._requests[rid] = params.get("request", {}).get("method", "GET")
+            elif method == "Network.responseReceived":
+                self._pending[rid] = params
+            elif method == "Network.loadingFinished" and rid in self._pending:
+                self._save_response(rid, self._pending.pop(rid), step)
+
+    def _save_response(self, rid: str, params: dict, step: str):
+        resp = params.get("response", {})
+        url = resp.get("url", "")
+        if not url.startswith("http"):
+            return  # data:, blob:, chrome-extension: ...
+        data, body_missing = b"", False
+        try:
+            body = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": rid})
+            raw = body.get("body", "")
+            data = base64.b64decode(raw) if body.get("base64Encoded") else raw.encode("utf-8")
+        except Exception:
+            # evicted or bodiless (204, redirects); headers are still worth keeping, but say so
+            body_missing = True
+        fname = f"responses/{len(self.manifest['responses']):04d}"
+        with open(os.path.join(self.bundle, fname), "wb") as f:
+            f.write(data)
+        self.manifest["responses"].append({
+            "url": url,
+            "method": self._requests.get(rid, "GET"),
+            "status": resp.get("status", 200),
+            "type": params.get("type", ""),
+            "mime": resp.get("mimeType", ""),
+            "headers": resp.get("headers", {}),
+            "body": fname,
+            "step": step,
+        })
+        if body_missing:
+            self.manifest["responses"][-1]["body_missing"] = True
+
+    def snapshot(self, step: str):
+        """Collect the responses that finished during `step`, then save the DOM as it stands."""
+        self._drain(step)
+        slug = re.sub(r"[^a-z0-9]+", "_", step.lower()).strip("_")
+        fname = f"dom/{len(self.manifest['snapshots']):02d}_{slug}.html"
+        try:
+            with open(os.path.join(self.bundle, fname), "w", encoding="utf-8") as f:
+                f.write(self.driver.page_source)
+            current = self.driver.current_url
+        except Exception as e:
+            write_log(f"SessionRecorder snapshot '{step}' failed: {e}")
+            return
+        self.manifest["snapshots"].append({
+            "step": step, "file": fname, "url": current, "t": round(time.time() - self._t0, 3),
+        })
+
+    def save(self) -> str:
+        self._drain("end")
+        with open(os.path.join(self.bundle, "manifest.json"), "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=2)
+        missing = sum(1 for r in self.manifest["responses"] if r.get("body_missing"))
+        msg = (f"Recorded session to {self.bundle}: {len(self.manifest['responses'])} responses "
+               f"({missing} without body), {len(self.manifest['snapshots'])} DOM snapshots")
+        print(f"💾 {msg}")
+        write_log(msg)
+        return self.bundle
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    """One port for both schemes: connections starting with a TLS handshake get wrapped."""
+    daemon_threads = True
+    ssl_context: Optional[ssl.SSLContext] = None
+
+    def finish_request(self, request, client_address):
+        conn = request
+        try:
+            request.settimeout(15)
+            if self.ssl_context and request.recv(1, socket.MSG_PEEK) == b"\x16":
+                conn = self.ssl_context.wrap_socket(request, server_side=True)
+        except Exception:
+            return
+        try:
+            super().finish_request(conn, client_address)
+        finally:
+            if conn is not request:
+                conn.close()
+
+class ReplayServer:
+    """
+    Serves a SessionRecorder bundle on 127.0.0.1 so run_scraper can run offline.
+    Every recorded host is mapped onto the server via build_driver(replay_host_rules=...),
+    over HTTP or HTTPS (self-signed cert; Chrome runs with --ignore-certificate-errors).
+    Responses are matched on (method, full url); a request seen several times is answered
+    in recorded order (the last answer repeats).
+    """
+    _SKIP_HEADERS = {"content-length", "content-encoding", "transfer-encoding", "connection",
+                     "keep-alive", "strict-transport-security", "alt-svc", "content-security-policy"}
+
+    def __init__(self, bundle: str):
+        with open(os.path.join(bundle, "manifest.json"), "r", encoding="utf-8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("version") != FIXTURE_VERSION:
+            raise ValueError(f"fixture bundle {bundle} is version {self.manifest.get('version')}, "
+                             f"expected {FIXTURE_VERSION}")
+        self.bundle = bundle
+        self.routes: Dict[Tuple[str, str], List[dict]] = {}
+        self.hosts = set()
+        for r in self.manifest["responses"]:
+            self.routes.setdefault((r["method"], _replay_key(r["url"])), []).append(r)
+            self.hosts.add(urlsplit(r["url"]).hostname)
+        self.hosts.add(urlsplit(self.manifest["url"]).hostname)
+        self.hosts.discard(None)
+        self.misses: List[str] = []
+        self._hits: Dict[Tuple[str, str], int] = {}
+        self._lock = threading.Lock()
+        self._certdir = None
+        self.httpd = None
+
+    def _ssl_context(self) -> Optional[ssl.SSLContext]:
+        self._certdir = tempfile.mkdtemp(prefix="replay_tls_")
+        key, cert = os.path.join(self._certdir, "key.pem"), os.path.join(self._certdir, "cert.pem")
+        try:
+            subprocess.run(
+                ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "2",
+                 "-subj", "/CN=replay.local", "-keyout", key, "-out", cert],
+                capture_output=True, check=True
+            )
+            ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ctx.load_cert_chain(cert, key)
+            return ctx
+        except Exception as e:
+            write_log(f"Replay: no TLS ({e}); https:// responses will not be served")
+            return None
+
+    def start(self) -> int:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._respond(self)
+            do_POST = do_GET
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = _ReplayHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.ssl_context = self._ssl_context()
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+        missing = sum(1 for r in self.manifest["responses"] if r.get("body_missing"))
+        write_log(f"Replaying {self.bundle} on port {self.port} "
+                  f"({len(self.routes)} routes, {missing} recorded without body, "
+                  f"hosts: {', '.join(sorted(self.hosts))})")
+        return self.port
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def host_rules(self) -> str:
+        rules = [f"MAP {host} 127.0.0.1:{self.port}" for host in sorted(self.hosts)]
+        return ", ".join(rules + ["MAP * ~NOTFOUND"])
+
+    def _respond(self, h):
+        length = int(h.headers.get("Content-Length") or 0)
+        if length:
+            h.rfile.read(length)
+        scheme = "https" if isinstance(h.connection, ssl.SSLSocket) else "http"
+        url = _replay_key(f"{scheme}://{h.headers.get('Host', '')}{h.path}")
+        key = (h.command, url)
+        with self._lock:
+            answers = self.routes.get(key)
+            if not answers:
+                self.misses.append(f"{h.command} {url}")
+                h.send_error(404)
+                return
+            n = self._hits.get(key, 0)
+            self._hits[key] = n + 1
+        r = answers[min(n, len(answers) - 1)]
+        with open(os.path.join(self.bundle, r["body"]), "rb") as f:
+            data = f.read()
+        h.send_response(r.get("status") or 200)
+        for k, v in r.get("headers", {}).items():
+            if k.lower() in self._SKIP_HEADERS:
+                continue
+            for line in str(v).split("\n"):  # CDP joins repeated headers with newlines
+                h.send_header(k, line)
+        h.send_header("Content-Length", str(len(data)))
+        h.end_headers()
+        h.wfile.write(data)
+
+    def stop(self):
+        if self.httpd:
+            self.httpd.shutdown()
+            self.httpd.server_close()
+        if self._certdir:
+            shutil.rmtree(self._certdir, ignore_errors=True)
+        if self.misses:
+            write_log(f"Replay: {len(self.misses)} request(s) not in bundle, e.g. {self.misses[:5]}")
+
+# -------------- WebDriver command tracing -------------- #
+class WebDriverTracer:
+    """
+    Records every WebDriver command with its duration, selector and the function in this
+    script that issued it. Everything (WebElement calls and WebDriverWait polls included)
+    funnels through driver.execute, so that is the one method wrapped.
+    Output: Chrome Trace Event JSON (open in ui.perfetto.dev) plus a top-commands summary.
+    """
+    def __init__(self):
+        self.events: List[Dict[str, Any]] = []
+        self._t0 = time.perf_counter()
+        self._pid = os.getpid()
+
+    def attach(self, driver):
+        inner = driver.execute
+        tracer = self
+
+        def execute(driver_command, params=None):
+            start = time.perf_counter()
+            try:
+                return inner(driver_command, params)
+            finally:
+                tracer._record(driver_command, params, start, time.perf_counter())
+
+        driver.execute = execute
+        return driver
+
+    @staticmethod
+    def _callers(limit=3) -> List[str]:
+        # innermost functions of this script on the stack, skipping the tracer itself
+        out = []
+        f = sys._getframe(3)
+        while f and len(out) < limit:
+            if f.f_code.co_filename == __file__ and f.f_code.co_name != "<module>":
+                out.append(f.f_code.co_name)
+            f = f.f_back
+        return out or ["?"]
+
+    @staticmethod
+    def _selector(params) -> str:
+        if not params:
+            return ""
+        if "using" in params:
+            return f"{params['using']}={params.get('value', '')}"
+        if "script" in params:
+            # Selenium atoms (get_attribute, is_displayed, ...) start with "/* name */"
+            atom = re.match(r"\s*/\*\s*(\w+)\s*\*/", params["script"])
+            if atom:
+                args = params.get("args") or []
+                return f"{atom.group(1)} {args[1]}" if len(args) > 1 else atom.group(1)
+            return " ".join(params["script"].split())[:80]
+        if "cmd" in params:
+            return params["cmd"]
+        if "url" in params:
+            return params["url"]
+        return ""
+
+    def _record(self, command, params, start, end):
+        callers = self._callers()
+        args = {"caller": callers[0], "stack": " < ".join(callers)}
+        sel = self._selector(params)
+        if sel:
+            args["selector"] = sel
+        self.events.append({
+            "name": command, "cat": "webdriver", "ph": "X",
+            "ts": round((start - self._t0) * 1e6), "dur": round((end - start) * 1e6),
+            "pid": self._pid, "tid": threading.get_native_id(), "args": args,
+        })
+
+    def summary(self, top=15) -> str:
+        by_cmd: Dict[Tuple[str, str], List[float]] = {}
+        for ev in self.events:
+            stat = by_cmd.setdefault((ev["args"]["caller"], ev["name"]), [0.0, 0])
+            stat[0] += ev["dur"] / 1000
+            stat[1] += 1
+        total_ms = sum(v[0] for v in by_cmd.values())
+        lines = [f"{len(self.events)} WebDriver commands, {total_ms / 1000:.1f}s total"]
+        for title, key in (("by total time", lambda kv: kv[1][0]), ("by count", lambda kv: kv[1][1])):
+            lines.append(f"Top {top} {title}:")
+            for (caller, cmd), (ms, n) in sorted(by_cmd.items(), key=key, reverse=True)[:top]:
+                lines.append(f"  {ms:9.1f} ms  {n:6d}x  {caller} -> {cmd}")
+        return "\n".join(lines)
+
+    def save(self) -> str:
+        os.makedirs(TRACES_DIR, exist_ok=True)
+        path = os.path.join(TRACES_DIR, f"webdriver_trace_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        meta = [{"name": "process_name", "ph": "M", "pid": self._pid, "args": {"name": "target_optical_scraper"}}]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": meta + self.events, "displayTimeUnit": "ms"}, f)
+        summary = self.summary()
+        with open(path.replace(".json", "_summary.txt"), "w", encoding="utf-8") as f:
+            f.write(summary + "\n")
+        print(f"🧭 WebDriver trace saved to {path}\n{summary}")
+        write_log(f"WebDriver trace saved to {path}\n{summary}")
+        return path
+
+# -------------------- Scraper core -------------------- #
+def run_scraper(record=False, replay_bundle=None, trace=False):
+    """
+    One scrape cycle. record=True captures the session as a fixture bundle;
+    replay_bundle=<dir> runs against a recorded bundle offline instead of the live site,
+    with "today" (ours and the page's) pinned to when it was recorded;
+    trace=True records every WebDriver command to TRACES_DIR.
+    """
+    cycle_started = time.time()
+    deadline = Deadline()
+    governor = BrowserGovernor()
+    # Last line of defence: a wedged chromedriver call can't be clamped, so kill the browser
+    watchdog = threading.Timer(CYCLE_BUDGET_SECONDS + WATCHDOG_GRACE_SECONDS, governor.abort,
+                               args=(f"cycle exceeded {CYCLE_BUDGET_SECONDS}s budget",))
+    watchdog.daemon = True
+    watchdog.start()
+    replay = None
+    replay_today = None
+    recorder = None
+    tracer = WebDriverTracer() if trace else None
+    config, _ = load_config()
+    store_number = config.get("store_number", 2064)
+    url = get_schedule_exam_url(store_number)
+    try:
+        html_path = HTML_FILENAME
+        if replay_bundle:
+            replay = ReplayServer(replay_bundle)
+            replay_today = datetime.fromisoformat(replay.manifest["recorded_at"])
+            replay.start()
+            store_number = replay.manifest.get("store_number", store_number)
+            url = replay.manifest["url"]
+            html_path = REPLAY_HTML_FILENAME
+        print(f"[DEBUG] Using store_number: {store_number}")
+        print(f"[DEBUG] Full URL: {url}{' (replay)' if replay else ''}")
+        write_log(f"[DEBUG] URL: {url}{' (replay of ' + replay_bundle + ')' if replay else ''}")
+
+        while True:
+            try:
+                deadline.start("load")
+                driver = governor.launch(record=record, replay_host_rules=replay.host_rules() if replay else None,
+                                         fake_now=replay_today)
+                if tracer:
+                    tracer.attach(driver)
+                if record:
+                    # one bundle per cycle, even if the browser gets recycled part way
+                    if recorder is None:
+                        recorder = SessionRecorder(driver, store_number, url)
+                    else:
+                        recorder.switch_driver(driver)
+                driver.set_page_load_timeout(max(1, deadline.remaining()))
+                driver.get(url)
+                time.sleep(1.2)
+                governor.checkpoint("load")
+                if recorder:
+                    recorder.snapshot("load")
+
+                deadline.start("wizard")
+                navigate_intro_flow(driver, recorder=recorder, deadline=deadline)
+                governor.checkpoint("wizard")
+
+                # Make sure we're in the calendar context
+                driver.switch_to.default_content()
+                if not (driver.find_elements(By.CSS_SELECTOR, "button[aria-label='Go to next month']") or _has_enabled_numeric_day(driver)):
+                    switch_into_calendar_iframe(driver)
+                governor.checkpoint("calendar")  # last point a recycle costs no scraped days
+                if recorder:
+                    recorder.snapshot("calendar")
+
+                appts = []
+                first_update = None
+                for day in scrape_calendar(driver, store_number, url, governor=governor, recorder=recorder,
+                                           deadline=deadline, today=replay_today):
+                    appts.append(day)
+                    if len(appts) >= PROGRESSIVE_PUBLISH_AFTER_DAYS:
+                        if publish_progress(store_number, url, appts, html_path, merge_cached=not replay) and first_update is None:
+                            first_update = time.time() - cycle_started
+                            write_log(f"First dashboard update {first_update:.1f}s into the cycle")
+                break
+            except BrowserRecycle as r:
+                if recorder:
+                    recorder.snapshot(f"recycle after {r.phase}")  # drain the old driver while it's alive
+                governor.recycle(r)
+
+        if replay:
+            write_dashboard(render_dashboard(appts, store_number, url), html_path)
+        else:
+            publish_results(store_number, url, appts)
 
     except Exception as e:
         write_log(f"run_scraper error: {e}")
+        if not replay:
+            # keep the kiosk on the last good data; the banner shows how old it is
+            try:
+                show_cached_results(store_number, url)
+            except Exception as ee:
+                write_log(f"show_cached_results failed: {ee}")
         try:
+            driver = governor.driver
             if driver:
                 with open("last_error_page.html", "w", encoding="utf-8") as f:
                     f.write(driver.page_source)
@@ -559,20 +1415,39 @@ def run_scraper():
         except Exception as ee:
             write_log(f"debug save failed: {ee}")
     finally:
-        try:
-            if driver:
-                driver.quit()
-        except Exception:
-            pass
-
-def scrape_calendar(driver, store_number, url):
-    today = datetime.today()
-    appts = []
+        watchdog.cancel()
+        write_log(f"Phase timings: {deadline.summary()}")
+        if tracer:
+            try:
+                tracer.save()
+            except Exception as e:
+                write_log(f"WebDriver trace save failed: {e}")
+        if recorder:
+            try:
+                recorder.save()
+            except Exception as e:
+                write_log(f"SessionRecorder save failed: {e}")
+        governor.shutdown()
+        reap_orphaned_browsers()
+        governor.log_cycle_stats()
+        if replay:
+            replay.stop()
+
+def scrape_calendar(driver, store_number, url, governor=None, recorder=None, deadline=None,
+                    today: Optional[datetime] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Yield each day's results as soon as it is scraped (up to MAX_DAYS_PER_RUN days).
+    If the deadline runs out the generator just stops; the days already yielded stand.
+    `today` (default: now) decides which days are past; replay pins it to the recording date.
+    """
+    today = today or datetime.today()
     total_days = 0
 
     # Ensure calendar loaded
+    if deadline:
+        deadline.start("calendar")
     try:
-        wait_for_calendar_loaded(driver, timeout=25)
+        wait_for_calendar_loaded(driver, timeout=25, deadline=deadline)
     except Exception:
         pass
 
@@ -581,91 +1456,135 @@ def scrape_calendar(driver, store_number, url):
     parsed = parse_month_year_from_header(header) if header else None
     cur_month, cur_year = (parsed if parsed else (today.month, today.year))
 
-    for month_idx in range(MONTHS_TO_SCAN):
-        # Gather enabled days for (cur_year, cur_month)
-        pairs = find_enabled_day_elements(driver, cur_year, cur_month)
-
-        # filter out past days if current month
-        filtered = []
-        for el, dn in pairs:
-            if cur_year == today.year and cur_month == today.month and dn < today.day:
-                continue
-            filtered.append((el, dn))
-
-        unique_days = sorted({dn for _, dn in filtered})
-        if not unique_days:
-            print(f"❌ No available appointment days found in {calmod.month_name[cur_month]} {cur_year}.")
-        else:
-            print(f"\n📅 [{cur_year}-{cur_month:02d}] Enabled days: {unique_days}")
+    if deadline:
+        deadline.start("days")
+    try:
+        for month_idx in range(MONTHS_TO_SCAN):
+            # Gather enabled days for (cur_year, cur_month)
+            pairs = find_enabled_day_elements(driver, cur_year, cur_month)
+
+            # filter out past days if current month
+            filtered = []
+            for el, dn in pairs:
+                if cur_year == today.year and cur_month == today.month and dn < today.day:
+                    continue
+                filtered.append((el, dn))
 
-        for dn in unique_days:
-            if total_days >= MAX_DAYS_PER_RUN:
-                break
+            unique_days = sorted({dn for _, dn in filtered})
+            if not unique_days:
+                print(f"❌ No available appointment days found in {calmod.month_name[cur_month]} {cur_year}.")
+            else:
+                print(f"\n📅 [{cur_year}-{cur_month:02d}] Enabled days: {unique_days}")
 
-            # re-find the element fresh
-            target = None
-            fresh = find_enabled_day_elements(driver, cur_year, cur_month)
-            for el, num in fresh:
-                if num == dn:
-                    target = el
+            for dn in unique_days:
+                if total_days >= MAX_DAYS_PER_RUN:
                     break
-            if not target:
-                print(f"⚠️ Day {dn} not clickable now; skipping.")
-                continue
-
-            driver.execute_script("arguments[0].scrollIntoView({block:'center'});", target)
-            ok = stable_click(driver, target)
-            print(f"👉 Click date {dn} ({calmod.month_name[cur_month]}) {'✓' if ok else '✗'}")
-            if not ok:
-                continue
-
-            prev_len = len(driver.page_source)
-            wait_for_slots_change(driver, prev_len, tries=24)
-
-            slots_by, doctors = collect_slots_any_ui(driver)
-            full_date = datetime(cur_year, cur_month, dn)
-            appts.append({
-                "date": full_date.strftime("%A, %B %d"),
-                "date_obj": full_date,
-                "morning": slots_by.get("morning", []),
-                "afternoon": slots_by.get("afternoon", []),
-                "evening": slots_by.get("evening", []),
-                "doctors": set(doctors),
-            })
-            total_days += 1
+                if deadline:
+                    deadline.check()
+
+                # re-find the element fresh
+                target = None
+                fresh = find_enabled_day_elements(driver, cur_year, cur_month)
+                for el, num in fresh:
+                    if num == dn:
+                        target = el
+                        break
+                if not target:
+                    print(f"⚠️ Day {dn} not clickable now; skipping.")
+                    continue
 
-            # Save per-day debug if nothing
-            if not any([slots_by.get("morning"), slots_by.get("afternoon"), slots_by.get("evening")]):
-                try:
-                    with open(f"debug_no_slots_{cur_year}-{cur_month:02d}-{dn:02d}.html","w",encoding="utf-8") as f:
-                        f.write(driver.page_source)
-                    driver.save_screenshot(f"debug_no_slots_{cur_year}-{cur_month:02d}-{dn:02d}.png")
-                except Exception as e:
-                    write_log(f"debug save failed: {e}")
+                driver.execute_script("arguments[0].scrollIntoView({block:'center'});", target)
+                ok = stable_click(driver, target)
+                print(f"👉 Click date {dn} ({calmod.month_name[cur_month]}) {'✓' if ok else '✗'}")
+                if not ok:
+                    continue
 
-        if total_days >= MAX_DAYS_PER_RUN:
-            break
+                prev_len = len(driver.page_source)
+                wait_for_slots_change(driver, prev_len, tries=24, deadline=deadline)
+                if deadline:
+                    deadline.check()  # slots may not have loaded; don't report the day as empty
+
+                slots_by, doctors = collect_slots(driver, store_number, deadline=deadline)
+                if deadline:
+                    deadline.check()  # collection was cut short; the day is incomplete
+                if recorder:
+                    recorder.snapshot(f"day {cur_year}-{cur_month:02d}-{dn:02d}")
+                full_date = datetime(cur_year, cur_month, dn)
+                total_days += 1
+
+                # Save per-day debug if nothing
+                if not any([slots_by.get("morning"), slots_by.get("afternoon"), slots_by.get("evening")]):
+                    try:
+                        with open(f"debug_no_slots_{cur_year}-{cur_month:02d}-{dn:02d}.html","w",encoding="utf-8") as f:
+                            f.write(driver.page_source)
+                        driver.save_screenshot(f"debug_no_slots_{cur_year}-{cur_month:02d}-{dn:02d}.png")
+                    except Exception as e:
+                        write_log(f"debug save failed: {e}")
+
+                yield {
+                    "date": full_date.strftime("%A, %B %d"),
+                    "date_obj": full_date,
+                    "morning": slots_by.get("morning", []),
+                    "afternoon": slots_by.get("afternoon", []),
+                    "evening": slots_by.get("evening", []),
+                    "doctors": set(doctors),
+                }
+                if governor:
+                    governor.checkpoint(f"day {cur_month:02d}-{dn:02d}", defer=True)
 
-        # Move to next month
-        if month_idx < MONTHS_TO_SCAN - 1:
-            moved = click_next_month(driver)
-            if not moved:
-                print("No next month or unable to click next month.")
+            if total_days >= MAX_DAYS_PER_RUN:
                 break
-            # wait a moment for calendar to swap
-            time.sleep(0.5)
-            header = month_header_text(driver)
-            parsed = parse_month_year_from_header(header) if header else None
-            if parsed:
-                cur_month, cur_year = parsed
-            else:
-                # fallback increment
-                if cur_month == 12:
-                    cur_month, cur_year = 1, cur_year + 1
+
+            # Move to next month
+            if month_idx < MONTHS_TO_SCAN - 1:
+                if deadline:
+                    deadline.check()
+                moved = click_next_month(driver, deadline=deadline)
+                if not moved:
+                    print("No next month or unable to click next month.")
+                    break
+                # wait a moment for calendar to swap
+                time.sleep(0.5)
+                header = month_header_text(driver)
+                parsed = parse_month_year_from_header(header) if header else None
+                if parsed:
+                    cur_month, cur_year = parsed
                 else:
-                    cur_month += 1
+                    # fallback increment
+                    if cur_month == 12:
+                        cur_month, cur_year = 1, cur_year + 1
+                    else:
+                        cur_month += 1
+    except DeadlineExceeded as e:
+        print(f"⏱ {e}; keeping {total_days} day(s) scraped so far.")
+        write_log(f"scrape_calendar: {e}; returning {total_days} partial day(s)")
+
+# -------------- Dashboard / result cache -------------- #
+def _format_age(seconds: float) -> str:
+    mins = int(round(seconds / 60))
+    return f"{mins} min" if mins < 90 else f"{int(round(mins / 60))} h"
+
+_QR_CACHE: Dict[str, str] = {}
+
+def _qr_base64(url: str) -> str:
+    # the dashboard is re-rendered after every day now; the QR never changes
+    if url not in _QR_CACHE:
+        qr = qrcode.make(url)
+        buf = BytesIO()
+        qr.save(buf, format="PNG")
+        _QR_CACHE[url] = base64.b64encode(buf.getvalue()).decode("utf-8")
+    return _QR_CACHE[url]
+
+def render_dashboard(appts, store_number, url, updated_at: Optional[datetime] = None) -> str:
+    """
+    Build eye_appointments.html. updated_at is when the data was scraped (now for fresh results,
+    the snapshot time for cached ones); past STALE_AFTER_MINUTES a staleness banner is shown,
+    and a small script keeps that banner honest even if the scraper stops writing.
+    """
+    updated_at = updated_at or datetime.now()
+    age = (datetime.now() - updated_at).total_seconds()
+    stale = age > STALE_AFTER_MINUTES * 60
 
-    # ---------- Build HTML ----------
     rel_days = []
     today2 = datetime.today().date()
     for d in appts:
@@ -678,10 +1597,7 @@ def scrape_calendar(driver, store_number, url):
             rel_days.append(d["date_obj"].strftime("%A"))
     avail_message = ", ".join(rel_days) if rel_days else "No appointments found"
 
-    qr = qrcode.make(url)
-    buf = BytesIO()
-    qr.save(buf, format="PNG")
-    qr_base64 = base64.b64encode(buf.getvalue()).decode("utf-8")
+    qr_base64 = _qr_base64(url)
 
     logo_base64, logo_ext = load_logo_base64()
     logo_mime = "image/png" if logo_ext == "png" else "image/jpeg"
@@ -736,6 +1652,7 @@ body {{ font-family: 'Segoe UI', sans-serif; background:#fff; color:#222; paddin
 .none {{ background:#ffe5e5; border-left-color:#f44336; }}
 .footer {{ width:100%; text-align:center; margin-top:40px; }}
 .footer p {{ font-size:min(5vw,42px); }}
+.stale {{ font-size:min(4.5vw,30px); margin:0 auto 10px; padding:8px 16px; max-width:90%; background:#fff4e0; color:#a65c00; border:3px solid #ff9800; border-radius:8px; }}
 </style></head><body>
 <header class="top-bar">
 <img class="qr-top-left" src="data:image/png;base64,{qr_base64}" alt="QR Code">
@@ -743,15 +1660,177 @@ body {{ font-family: 'Segoe UI', sans-serif; background:#fff; color:#222; paddin
 <h1>Target Optical – Store #{store_number}</h1>
 <h2 class="subtitle">Appointment Availability</h2>
 <p class="availability">Appointments available as soon as {avail_message}</p>
-<p class="updated">Last updated: {datetime.now().strftime('%A, %B %d, %Y %I:%M %p')}</p>
+<p class="updated">Last updated: {updated_at.strftime('%A, %B %d, %Y %I:%M %p')}</p>
+<p id="stale-banner" class="stale" style="display:{'block' if stale else 'none'}">⚠️ Showing saved results from <span id="stale-age">{_format_age(age)}</span> ago – refreshing…</p>
 </header>
 {day_cards}
 <div class="footer"><p>For appointments further out, please visit our website or scan the QR code above.</p></div>
+<script>
+(function() {{
+  var savedAt = {int(updated_at.timestamp() * 1000)}, limit = {STALE_AFTER_MINUTES * 60000};
+  function fmt(ms) {{ var m = Math.round(ms / 60000); return m < 90 ? m + " min" : Math.round(m / 60) + " h"; }}
+  function tick() {{
+    var age = Date.now() - savedAt;
+    if (age > limit) {{
+      document.getElementById("stale-age").textContent = fmt(age);
+      document.getElementById("stale-banner").style.display = "block";
+    }}
+  }}
+  tick(); setInterval(tick, 30000);
+}})();
+</script>
 </body></html>
 """
-    with open(HTML_FILENAME, "w", encoding="utf-8") as f:
+    return html_output
+
+def write_dashboard(html_output: str, html_path=HTML_FILENAME):
+    # write-then-rename so a kiosk reloading mid-write never sees a half file
+    tmp = f"{html_path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
         f.write(html_output)
-    print(f"✅ HTML saved at ~/{HTML_FILENAME}")
+    os.replace(tmp, html_path)
+    print(f"✅ HTML saved at ~/{html_path}")
+
+def _appt_to_json(d) -> Dict[str, Any]:
+    return {
+        "date_obj": d["date_obj"].strftime("%Y-%m-%d"),
+        "morning": d["morning"],
+        "afternoon": d["afternoon"],
+        "evening": d["evening"],
+        "doctors": sorted(d["doctors"]),
+    }
+
+def _appt_from_json(d) -> Dict[str, Any]:
+    full_date = datetime.strptime(d["date_obj"], "%Y-%m-%d")
+    return {
+        "date": full_date.strftime("%A, %B %d"),
+        "date_obj": full_date,
+        "morning": d.get("morning", []),
+        "afternoon": d.get("afternoon", []),
+        "evening": d.get("evening", []),
+        "doctors": set(d.get("doctors", [])),
+    }
+
+def _read_result_cache() -> Dict[str, Any]:
+    try:
+        with open(RESULTS_CACHE_FILE, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        write_log(f"results cache unreadable: {e}")
+        return {}
+
+def load_result_cache(store_number) -> Optional[Dict[str, Any]]:
+    """Last known good snapshot for a store: {"saved_at": datetime, "appts": [...], "pending": ...}."""
+    entry = _read_result_cache().get(str(store_number))
+    if not entry:
+        return None
+    try:
+        today = datetime.today().date()
+        appts = [_appt_from_json(d) for d in entry.get("appts", [])]
+        return {
+            "saved_at": datetime.fromisoformat(entry["saved_at"]),
+            "appts": [d for d in appts if d["date_obj"].date() >= today],
+            "pending": entry.get("pending"),
+        }
+    except Exception as e:
+        write_log(f"results cache entry for store {store_number} invalid: {e}")
+        return None
+
+def save_result_cache(store_number, appts=None, saved_at: Optional[datetime] = None, pending=None):
+    cache = _read_result_cache()
+    entry = cache.get(str(store_number), {})
+    if appts is not None:
+        entry["appts"] = [_appt_to_json(d) for d in appts]
+        entry["saved_at"] = (saved_at or datetime.now()).isoformat(timespec="seconds")
+    entry["pending"] = pending
+    cache[str(store_number)] = entry
+    tmp = f"{RESULTS_CACHE_FILE}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(cache, f, indent=2)
+    os.replace(tmp, RESULTS_CACHE_FILE)
+
+def _slot_count(appts) -> int:
+    return sum(len(d["morning"]) + len(d["afternoon"]) + len(d["evening"]) for d in appts)
+
+def suspicious_result_reason(appts, cached_appts) -> Optional[Tuple[str, str]]:
+    """(kind, description) of why a fresh scrape looks broken next to the cached one, or None."""
+    if not _slot_count(cached_appts):
+        return None  # nothing better to fall back on
+    if not appts:
+        return "empty", "no appointment days found"
+    if not _slot_count(appts):
+        return "no_slots", "no time slots on any day"
+    if len(appts) * 2 < min(len(cached_appts), MAX_DAYS_PER_RUN):
+        return "partial", f"only {len(appts)} day(s) vs {len(cached_appts)} cached"
+    return None
+
+def _confirms_pending(pending, kind: str) -> bool:
+    # a retry only confirms the same kind of result, seen within the last couple of cycles
+    if not pending or pending.get("kind") != kind:
+        return False
+    try:
+        age = (datetime.now() - datetime.fromisoformat(pending["seen_at"])).total_seconds()
+    except Exception:
+        return False
+    return age <= 2 * (REFRESH_SECONDS + CYCLE_BUDGET_SECONDS)
+
+def show_cached_results(store_number, url, html_path=HTML_FILENAME) -> bool:
+    """Re-render the dashboard from the last known good snapshot (with its real age)."""
+    entry = load_result_cache(store_number)
+    if not entry:
+        return False
+    write_dashboard(render_dashboard(entry["appts"], store_number, url, entry["saved_at"]), html_path)
+    return True
+
+def publish_progress(store_number, url, appts, html_path=HTML_FILENAME, merge_cached=True) -> bool:
+    """
+    Mid-cycle update after each scraped day. Days not reached yet are filled in from the
+    cached snapshot so the board doesn't shrink while the scrape is still running; while
+    any cached day is shown, the board carries the snapshot's timestamp. The cache itself
+    is only touched by publish_results() at the end of the cycle.
+    """
+    if not _slot_count(appts):
+        return False  # nothing worth showing over the cached board yet
+    shown = list(appts)
+    updated_at = None
+    if merge_cached:
+        entry = load_result_cache(store_number)
+        if entry:
+            last = max(d["date_obj"] for d in appts)
+            shown += [d for d in entry["appts"] if d["date_obj"] > last]
+            shown = shown[:max(MAX_DAYS_PER_RUN, len(appts))]
+            if len(shown) > len(appts):
+                # part of the board is still the cached snapshot; date (and staleness) it as such
+                updated_at = entry["saved_at"]
+    write_dashboard(render_dashboard(shown, store_number, url, updated_at), html_path)
+    return True
+
+def publish_results(store_number, url, appts, html_path=HTML_FILENAME) -> bool:
+    """
+    Stale-while-revalidate: fresh results replace the cached snapshot unless they look
+    empty/partial next to it. Such a result is held back once and only accepted if the
+    next revalidation sees the same thing; until then the cached snapshot stays up.
+    """
+    entry = load_result_cache(store_number)
+    cached = entry["appts"] if entry else []
+    suspicious = suspicious_result_reason(appts, cached)
+    if suspicious:
+        kind, reason = suspicious
+        if entry and _confirms_pending(entry.get("pending"), kind):
+            write_log(f"Suspicious result confirmed on retry ({reason}); accepting it")
+        else:
+            print(f"⚠️ Result looks incomplete ({reason}); keeping cached results until confirmed.")
+            write_log(f"Refusing suspicious result for store {store_number}: {reason}")
+            save_result_cache(store_number, pending={
+                "kind": kind, "reason": reason, "seen_at": datetime.now().isoformat(timespec="seconds"),
+            })
+            show_cached_results(store_number, url, html_path)
+            return False
+    save_result_cache(store_number, appts)
+    write_dashboard(render_dashboard(appts, store_number, url), html_path)
+    return True
 
 # -------------------- Main loop -------------------- #
 if __name__ == "__main__":
@@ -765,6 +1844,31 @@ if __name__ == "__main__":
     start_hour = config.get("start_hour")
     end_hour = config.get("end_hour")
     refresh_count = 0
+    trace = TRACE_WEBDRIVER or "--trace" in sys.argv
+    reap_orphaned_browsers()  # leftovers from a crashed/killed previous run
+
+    # One-shot tools: capture a live session, or run a captured one offline
+    if "--record" in sys.argv:
+        run_scraper(record=True, trace=trace)
+        sys.exit(0)
+    if "--replay" in sys.argv:
+        idx = sys.argv.index("--replay")
+        if idx + 1 >= len(sys.argv):
+            print("Usage: python3 target_optical_scraper.py --replay fixtures/<bundle>")
+            sys.exit(2)
+        t0 = time.time()
+        run_scraper(replay_bundle=sys.argv[idx + 1], trace=trace)
+        elapsed = time.time() - t0
+        print(f"⏱ Replay cycle took {elapsed:.1f}s")
+        write_log(f"Replay of {sys.argv[idx + 1]} took {elapsed:.1f}s")
+        sys.exit(0)
+
+    # Put the last known good results up right away; the first scrape revalidates them
+    store_number = config.get("store_number", 2064)
+    try:
+        show_cached_results(store_number, get_schedule_exam_url(store_number))
+    except Exception as e:
+        write_log(f"show_cached_results failed: {e}")
 
     if check_update_available():
         print("🚨 UPDATE REQUIRED! Pulling latest…")
@@ -795,7 +1899,7 @@ if __name__ == "__main__":
                 time.sleep(8)
                 continue
 
-        run_scraper()
+        run_scraper(trace=trace)
         refresh_count += 1
 
         if refresh_count % UPDATE_CHECK_INTERVAL == 0 and check_update_available():
@@ -809,6 +1913,6 @@ if __name__ == "__main__":
                 time.sleep(8)
                 continue
 
-        manual = countdown_timer(300)
+        manual = countdown_timer(REFRESH_SECONDS)
         if manual:
             write_log("Manual refresh requested.")